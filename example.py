@@ -2,16 +2,70 @@
 Example client implmented using wac. See `README` for a guided walk-though
 based on this example client.
 """
-from datetime import datetime
+from datetime import datetime, timedelta, tzinfo
 import json
 
-import iso8601
+try:
+    from ciso8601 import parse_datetime as _ciso8601_parse
+except ImportError:
+    _ciso8601_parse = None
+    from iso8601 import parse_date as _parse_dt
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
 import wac
 
 
 __version__ = '1.0'
 
 
+class _UTC(tzinfo):
+
+    def utcoffset(self, dt):
+        return timedelta(0)
+
+    def tzname(self, dt):
+        return 'UTC'
+
+    def dst(self, dt):
+        return timedelta(0)
+
+
+_utc = _UTC()
+
+
+if _ciso8601_parse is not None:
+    def _parse_dt(value):
+        # ciso8601 leaves values without an offset naive whereas iso8601
+        # treats them as UTC, so match that
+        dt = _ciso8601_parse(value)
+        if dt.tzinfo is None:
+            dt = dt.replace(tzinfo=_utc)
+        return dt
+
+
+def _json_dumps(data, default):
+    # always encode with json, ujson's `double_precision` counts decimal
+    # places so small or long floats would be rounded
+    return json.dumps(data, default=default)
+
+
+if ujson is not None:
+    def _json_loads(content):
+        return ujson.loads(content, precise_float=True)
+else:
+    _json_loads = json.loads
+
+
+# serializers for types json can't handle, keyed by type (subclasses are
+# added on first use)
+_SERIALIZERS = {
+    datetime: lambda o: o.isoformat() + 'Z',
+}
+
+
 default_config = wac.Config(None)
 
 
@@ -23,9 +77,9 @@ def configure(root_url, **kwargs):
     """
     default = kwargs.pop('default', True)
     kwargs['client_agent'] = 'example-client/' + __version__
-    if 'headers' not in kwargs:
-        kwargs['headers'] = {}
-    kwargs['headers']['Accept-Type'] = 'application/json'
+    headers = dict(kwargs.get('headers') or {})
+    headers['Accept-Type'] = 'application/json'
+    kwargs['headers'] = headers
     if default:
         default_config.reset(root_url, **kwargs)
     else:
@@ -51,40 +105,64 @@ class Client(wac.Client):
 
     @staticmethod
     def _convert_exception(ex):
-        if not hasattr(ex, 'type'):
+        error_cls = _ERROR_TYPES.get(getattr(ex, 'type', None))
+        if error_cls is None:
             return ex
-        if ex.type == PlaylistError.EXPLODED:
-            ex = PlaylistError(*ex.args, **ex.__dict__)
-        return ex
+        # our own errors keep their API fields apart from `_kwargs` itself
+        fields = getattr(ex, '_kwargs', ex.__dict__)
+        return error_cls(*ex.args, **fields)
 
     @staticmethod
     def _default_serialize(o):
-        if isinstance(o, datetime):
-            return o.isoformat() + 'Z'
-        raise TypeError(
-            'Object of type {} with value of {} is not JSON serializable'
-            .format(type(o), repr(o))
-        )
+        serializer = _SERIALIZERS.get(type(o))
+        if serializer is None:
+            for type_, serializer in _SERIALIZERS.items():
+                if isinstance(o, type_):
+                    _SERIALIZERS[type(o)] = serializer
+                    break
+            else:
+                raise TypeError(
+                    'Object of type {} with value of {} is not JSON '
+                    'serializable'.format(type(o), repr(o))
+                )
+        return serializer(o)
 
     def _serialize(self, data):
-        data = json.dumps(data, default=self._default_serialize)
+        data = _json_dumps(data, self._default_serialize)
+        if not isinstance(data, bytes):
+            data = data.encode('utf-8')
         return 'application/json', data
 
     def _deserialize(self, response):
-        if response.headers['Content-Type'] != 'application/json':
+        content_type = response.headers.get('Content-Type', '')
+        if not content_type.startswith('application/json'):
             raise Exception(
-                "Unsupported content-type '{}'"
-                .format(response.headers['Content-Type'])
+                "Unsupported content-type '{}'".format(content_type)
             )
-        data = json.loads(response.content)
+        content = response.content
+        data = _json_loads(content)
+        if b'_at"' not in content:
+            # no *_at keys anywhere in the document so nothing to parse
+            return data
         return self._parse_deserialized(data)
 
     @staticmethod
     def _parse_deserialized(e):
-        if isinstance(e, dict):
-            for key in e.iterkeys():
-                if key.endswith('_at') and isinstance(e[key], basestring):
-                    e[key] = iso8601.parse_date(e[key])
+        parse_dt = _parse_dt
+        stack = [e]
+        while stack:
+            node = stack.pop()
+            if type(node) is dict:
+                for key, value in node.iteritems():
+                    if isinstance(value, basestring):
+                        if key[-3:] == '_at':
+                            node[key] = parse_dt(value)
+                    elif type(value) in (dict, list):
+                        stack.append(value)
+            elif type(node) is list:
+                stack.extend(
+                    value for value in node if type(value) in (dict, list)
+                )
         return e
 
 
@@ -92,12 +170,13 @@ class Error(Exception):
 
     def __init__(self, *args, **kwargs):
         super(Error, self).__init__(*args)
+        self._kwargs = kwargs
         for k, v in kwargs.iteritems():
             setattr(self, k, v)
 
     def __repr__(self):
-        attrs = ', '.join(['{}={}'.format(k, repr(v))
-                           for k, v in self.__dict__.iteritems()])
+        attrs = ', '.join('{}={}'.format(k, repr(v))
+                          for k, v in self._kwargs.iteritems())
         return '{}({}, {})'.format(
             self.__class__.__name__,
             ' '.join(self.args),
@@ -109,6 +188,11 @@ class PlaylistError(Error):
     EXPLODED = 'paylist-exploded'
 
 
+_ERROR_TYPES = {
+    PlaylistError.EXPLODED: PlaylistError,
+}
+
+
 class Resource(wac.Resource):
     """
     The `registry` attribute is used to store information about all resources
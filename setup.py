@@ -1,4 +1,4 @@
-import re
+import sys
 
 try:
     import setuptools
@@ -9,12 +9,27 @@ else:
     setup = setuptools.setup
 
 
+def read_version(path):
+    with open(path) as fo:
+        for line in fo:
+            if line.startswith('__version__'):
+                return line.split("'")[1]
+    raise RuntimeError('Unable to find __version__ in {0}'.format(path))
+
+
+tests_require = [
+    'simplejson >= 2.1',
+    'iso8601',
+]
+if sys.version_info < (3, 3):
+    tests_require.append('mock>=0.8')
+if sys.version_info < (3, 2):
+    tests_require.append('futures')
+
+
 setup(
     name='wac',
-    version=(re
-             .compile(r".*__version__ = '(.*?)'", re.S)
-             .match(open('wac.py').read())
-             .group(1)),
+    version=read_version('wac.py'),
     url='https://github.com/balanced/wac/',
     license=open('LICENSE').read(),
     author='Balanced',
@@ -27,12 +42,7 @@ setup(
     py_modules=['wac'],
     package_data={'': ['LICENSE']},
     include_package_data=True,
-    tests_require=[
-        'mock>=0.8',
-        'simplejson >= 2.1',
-        'unittest2 >= 0.5.1',
-        'iso8601',
-    ],
+    tests_require=tests_require,
     install_requires=[
         'certifi==0.0.8',  # force requests optional
         'chardet >= 1.0',  # force requests optional
@@ -1,25 +1,47 @@
 from __future__ import division
 from __future__ import unicode_literals
 
+import contextlib
+import datetime
 import imp
 import json
 import os
-import math
-import unittest2 as unittest
-import urllib
+import threading
+import unittest
+import urlparse
 
-from mock import Mock, patch
+try:
+    from unittest.mock import Mock, patch
+except ImportError:
+    from mock import Mock, patch
 
 import wac
 
 
 # utils
 
-to_json = json.dumps
+# keys are sorted so that equal payloads always encode to the same body
+def to_json(data):
+    return json.dumps(data, sort_keys=True)
+
 
 from_json = json.loads
 
 
+def _qs_eq(a, b):
+    return (
+        sorted(urlparse.parse_qsl(a, keep_blank_values=True)) ==
+        sorted(urlparse.parse_qsl(b, keep_blank_values=True))
+    )
+
+
+@contextlib.contextmanager
+def _configured(cli, root_url, **kwargs):
+    with cli:
+        cli.config = wac.Config(root_url, **kwargs)
+        yield cli.config
+
+
 def configure(root_url, **kwargs):
     default = kwargs.pop('default', True)
     kwargs['client_agent'] = 'test-client/' + wac.__version__
@@ -35,6 +57,99 @@ def configure(root_url, **kwargs):
 default_config = wac.Config(None)
 
 
+# fixtures
+
+_JSON_HEADERS = {'Content-Type': 'application/json'}
+
+_HI_YA = {'hi': 'ya'}
+
+_HI_YA_JSON = to_json(_HI_YA)
+
+_ITEMS_1_TO_8 = list(range(1, 9))
+
+_COMMON_PAGE_DATA = {
+    '_type': 'page',
+    '_uris': {
+        'first_uri': {
+            '_type': 'page',
+            'key': 'first',
+        },
+        'previous_uri': {
+            '_type': 'page',
+            'key': 'previous',
+        },
+        'next_uri': {
+            '_type': 'page',
+            'key': 'next',
+        },
+        'last_uri': {
+            '_type': 'page',
+            'key': 'last',
+        },
+    },
+    'first_uri': '/a/uri/first',
+    'previous_uri': '/a/uri/prev',
+    'next_uri': '/a/uri/next',
+    'last_uri': '/a/uri/last',
+    'total': 100,
+    'offset': 44,
+    'limit': 2,
+    'items': [],
+}
+
+_PAGE_DATA = dict(
+    _COMMON_PAGE_DATA,
+    uri='/a/uri',
+    items=[
+        {'a': 'b', 'one': 2},
+        {'a': 'c', 'one': 3},
+    ],
+)
+
+_PAGE_JSON = to_json(_PAGE_DATA)
+
+_BAD_REQUEST_BODY = (
+    b'{"status": "Bad Request", "status_code": "400", "description": '
+    b'"Invalid field \'your mom\' -- make sure its your dad too", '
+    b'"additional": null}'
+)
+
+_BAD_REQUEST_BODY_ADDL = (
+    b'{"status": "Bad Request", "status_code": "400", "description": '
+    b'"Invalid field \'your mom\' -- make sure its your dad too", '
+    b'"additional": "nothing personal"}'
+)
+
+_ERR_BASE = {
+    'status': '400 Bad Request',
+    'status_code': '400',
+    'additional': None,
+}
+
+_ERR_TYPE1 = to_json(dict(_ERR_BASE, type='type-1'))
+
+_ERR_TYPE2 = to_json(dict(_ERR_BASE, type='type-2'))
+
+_ERR_TYPE_OTHER = to_json(dict(_ERR_BASE, type='type-1138'))
+
+
+def _mock_response(headers, content=b'', **kwargs):
+    return Mock(
+        headers=headers, content=content, content_length=len(content),
+        **kwargs)
+
+
+class FakePage(object):
+
+    __slots__ = (
+        'items', 'total', 'offset', 'index', 'next', 'previous', 'fetched',
+    )
+
+    def __init__(self, **kwargs):
+        for name in self.__slots__:
+            setattr(self, name, kwargs.get(name))
+
+
 class Client(wac.Client):
 
     config = default_config
@@ -43,13 +158,14 @@ class Client(wac.Client):
         super(Client, self).__init__(keep_alive=False)
 
     def _serialize(self, data):
-        return 'application/json', json.dumps(data)
+        return 'application/json', to_json(data)
 
     def _deserialize(self, response):
-        if response.headers['Content-Type'] != 'application/json':
-            raise Exception("Unsupported content-type '{0}'"
-                            .format(response.headers['Content-Type']))
-        data = json.loads(response.content)
+        content_type = response.headers['Content-Type']
+        if content_type != 'application/json':
+            raise Exception(
+                "Unsupported content-type '{0}'".format(content_type))
+        data = from_json(response.content)
         return data
 
 
@@ -79,7 +195,14 @@ class Resource3(Resource):
 
 # tests
 
-TestCase = unittest.TestCase
+class TestCase(unittest.TestCase):
+
+    if not hasattr(unittest.TestCase, 'assertCountEqual'):
+        assertCountEqual = unittest.TestCase.assertItemsEqual
+
+
+requires_futures = unittest.skipIf(
+    wac.futures is None, 'concurrent.futures is not available')
 
 
 class TestConfig(TestCase):
@@ -109,6 +232,9 @@ class TestConfig(TestCase):
             keep_alive=True)
         config2 = config.copy()
         self.assertDictEqual(config.__dict__, config2.__dict__)
+        self.assertIsNot(config.headers, config2.headers)
+        self.assertIsNot(config.before_request, config2.before_request)
+        self.assertIsNot(config.after_request, config2.after_request)
 
 
 class TestClient(TestCase):
@@ -123,8 +249,8 @@ class TestClient(TestCase):
         _op.assert_called_once_with(
             wac.requests.post,
             '/a/post',
-            headers={'Content-Type': 'application/json'},
-            data='{"hi": "there"}')
+            headers=_JSON_HEADERS,
+            data=to_json({'hi': 'there'}))
 
     @patch('wac.Client._op')
     def test_get(self, _op):
@@ -135,12 +261,12 @@ class TestClient(TestCase):
 
     @patch('wac.Client._op')
     def test_put(self, _op):
-        self.cli.put('/a/put', data={'hi': 'ya'})
+        self.cli.put('/a/put', data=_HI_YA)
         _op.assert_called_once_with(
             wac.requests.put,
             '/a/put',
-            headers={'Content-Type': 'application/json'},
-            data='{"hi": "ya"}')
+            headers=_JSON_HEADERS,
+            data=_HI_YA_JSON)
 
     @patch('wac.Client._op')
     def test_delete(self, _op):
@@ -152,19 +278,10 @@ class TestClient(TestCase):
     @patch('wac.requests.get')
     def test_op_headers(self, f):
         f.__name__ = 'get'
-        response = f.return_value = Mock()
-        response.content_length = 0
-        response.headers = {'Content-Type': 'application/json'}
-        response.content = '{"hi": "ya"}'
-        with patch.object(self.cli, 'config') as config:
-            config.root_url = 'http://ex.com'
-            config.auth = None
-            config.keep_alive = False
-            config.allow_redirects = False
-            config.headers = {
-                'X-Custom': 'rimz',
-            }
-            config.timeout = 61.0
+        f.return_value = _mock_response(
+            _JSON_HEADERS, b'{"hi": "ya"}')
+        with _configured(self.cli, 'http://ex.com',
+                         headers={'X-Custom': 'rimz'}, timeout=61.0) as config:
             self.cli._op(f, '/a/uri')
         f.assert_called_once_with(
             'http://ex.com/a/uri',
@@ -175,17 +292,10 @@ class TestClient(TestCase):
     @patch('wac.requests.get')
     def test_op_auth(self, f):
         f.__name__ = 'get'
-        response = f.return_value = Mock()
-        response.headers = {'Content-Type': 'application/json'}
-        response.content = '{"hi": "ya"}'
-        with patch.object(self.cli, 'config') as config:
-            config.root_url = 'http://ex.com'
-            config.auth = ('bob', 'passwerd')
-            config.headers = {}
-            config.keep_alive = False
-            config.echo = False
-            config.allow_redirects = False
-            config.timeout = None
+        f.return_value = _mock_response(
+            _JSON_HEADERS, b'{"hi": "ya"}')
+        with _configured(
+                self.cli, 'http://ex.com', auth=('bob', 'passwerd')):
             self.cli._op(f, '/a/uri')
         f.assert_called_once_with(
             'http://ex.com/a/uri',
@@ -196,88 +306,42 @@ class TestClient(TestCase):
     @patch('wac.requests.post')
     def test_serialize(self, f):
         f.__name__ = 'post'
-        response = f.return_value = Mock()
-        response.headers = {}
-        with patch.object(self.cli, 'config') as config:
-            config.root_url = 'http://ex.com'
-            config.auth = None
-            config.echo = False
-            config.keep_alive = True
-            config.allow_redirects = False
-            config.headers = {
-                'X-Custom': 'rimz',
-            }
-            config.timeout = None
+        f.return_value = _mock_response({})
+        with _configured(self.cli, 'http://ex.com',
+                         headers={'X-Custom': 'rimz'}) as config:
             self.cli.post('/an/uri', data={'yo': 'dawg'})
         f.assert_called_once_with(
             'http://ex.com/an/uri',
             headers={'X-Custom': 'rimz', 'Content-Type': 'application/json'},
             allow_redirects=config.allow_redirects,
-            data='{"yo": "dawg"}')
+            data=to_json({'yo': 'dawg'}))
 
     @patch('wac.requests.get')
     def test_deserialize(self, f):
-        response = f.return_value = Mock()
         f.__name__ = 'get'
-        response.headers = {'Content-Type': 'application/json'}
-        response.content = '{"hi": "ya"}'
-        with patch.object(self.cli, 'config') as config:
-            config.root_url = 'http://ex.com'
-            config.auth = None
-            config.echo = False
-            config.keep_alive = False
-            config.headers = {}
-            config.allow_redirects = False
-            config.timeout = None
-            self.cli.get('/an/uri')
-        f.assert_called_once_with(
-            'http://ex.com/an/uri',
-            headers={},
-            allow_redirects=False)
-        self.assertEqual(response.data, {'hi': 'ya'})
-
-        f.reset_mock()
-
-        response = f.return_value = Mock()
-        f.__name__ = 'get'
-        response.headers = {}
-        with patch.object(self.cli, 'config') as config:
-            config.root_url = 'http://ex.com'
-            config.auth = None
-            config.echo = False
-            config.keep_alive = True
-            config.headers = {}
-            config.allow_redirects = False
-            config.timeout = 30.0
-            self.cli.get('/an/uri')
-        f.assert_called_once_with(
-            'http://ex.com/an/uri',
-            headers={},
-            allow_redirects=False,
-            timeout=30.0)
-        self.assertFalse(response.data, None)
-
-        f.reset_mock()
-
-        response = f.return_value = Mock()
-        f.__name__ = 'get'
-        response.headers = {'Content-Type': 'image/png'}
-        with patch.object(self.cli, 'config') as config:
-            config.root_url = 'http://ex.com'
-            config.auth = None
-            config.echo = False
-            config.keep_alive = True
-            config.allow_redirects = False
-            config.timeout = None
-            config.headers = {}
-            with self.assertRaises(Exception) as ex_ctx:
-                self.cli.get('/an/uri')
-        self.assertIn(
-            "Unsupported content-type 'image/png'", str(ex_ctx.exception))
-        f.assert_called_once_with(
-            'http://ex.com/an/uri',
-            headers={},
-            allow_redirects=False)
+        cases = [
+            (_JSON_HEADERS, b'{"hi": "ya"}', {}, {'hi': 'ya'}),
+            ({}, b'', {'timeout': 30.0}, None),
+            ({'Content-Type': 'image/png'}, b'', {}, Exception),
+        ]
+        for headers, content, kwargs, expected in cases:
+            f.reset_mock()
+            response = f.return_value = _mock_response(headers, content)
+            with _configured(self.cli, 'http://ex.com', **kwargs):
+                if expected is Exception:
+                    with self.assertRaises(Exception) as ex_ctx:
+                        self.cli.get('/an/uri')
+                    self.assertIn(
+                        "Unsupported content-type 'image/png'",
+                        str(ex_ctx.exception))
+                else:
+                    self.cli.get('/an/uri')
+                    self.assertEqual(response.data, expected)
+            f.assert_called_once_with(
+                'http://ex.com/an/uri',
+                headers={},
+                allow_redirects=False,
+                **kwargs)
 
     def test_config_context(self):
         org_config = self.cli.config
@@ -297,15 +361,9 @@ class TestClient(TestCase):
     @patch('wac.requests.get')
     def test_default_errors(self, _op):
         ex = wac.requests.HTTPError()
-        ex.response = Mock()
-        ex.response.status_code = 402
-        ex.response.content = (
-            '{"status": "Bad Request", "status_code": '
-            '"400", "description": "Invalid field \'your mom\' -- make '
-            'sure its your dad too", "additional": null}')
-        ex.response.headers = {
-            'Content-Type': 'application/json',
-        }
+        ex.response = _mock_response(
+            _JSON_HEADERS, _BAD_REQUEST_BODY,
+            status_code=402)
         _op.__name__ = 'get'
         _op.side_effect = ex
         with self.cli:
@@ -344,16 +402,8 @@ class TestClient(TestCase):
             return ex
 
         ex = wac.requests.HTTPError()
-        ex.response = Mock()
-        ex.response.status_code = 402
-        ex_data = {
-            'status': '400 Bad Request',
-            'status_code': '400',
-            'additional': None,
-        }
-        ex.response.headers = {
-            'Content-Type': 'application/json',
-        }
+        ex.response = _mock_response(
+            _JSON_HEADERS, status_code=402)
         _op.__name__ = 'get'
         _op.side_effect = ex
 
@@ -362,41 +412,36 @@ class TestClient(TestCase):
             self.cli.config.echo = False
             self.cli.config.error_cls = convert_error
 
-            ex_data['type'] = 'type-1'
-            ex.response.content = to_json(ex_data)
+            ex.response.content = _ERR_TYPE1
             with self.assertRaises(ErrorType1) as exc:
                 self.cli.get('/rejected')
 
-            ex_data['type'] = 'type-2'
-            ex.response.content = to_json(ex_data)
+            ex.response.content = _ERR_TYPE2
             with self.assertRaises(ErrorType2) as exc:
                 self.cli.get('/rejected')
 
-            ex_data['type'] = 'type-1138'
-            ex.response.content = to_json(ex_data)
+            ex.response.content = _ERR_TYPE_OTHER
             with self.assertRaises(ErrorType) as exc:
                 self.cli.get('/rejected')
 
     @patch('wac.requests.post')
     def test_request_handlers(self, f):
-        response = f.return_value
-        response.headers = {'Content-Type': 'application/json'}
-        response.content = '{"bye": "ya"}'
+        response = f.return_value = _mock_response(
+            _JSON_HEADERS, b'{"bye": "ya"}')
         f.__name__ = 'post'
-        f.return_value = response
         before_request = Mock()
         after_request = Mock()
         with self.cli:
             self.cli.config.root_url = '/test'
             self.cli.config.before_request.append(before_request)
             self.cli.config.after_request.append(after_request)
-            result = self.cli.post('/a/post/w/hooks', data={'hi': 'ya'})
+            result = self.cli.post('/a/post/w/hooks', data=_HI_YA)
         before_request.assert_called_once_with(
             'POST',
             '/test/a/post/w/hooks',
-            {'headers': {'Content-Type': 'application/json'},
+            {'headers': _JSON_HEADERS,
              'allow_redirects': False,
-             'data': '{"hi": "ya"}',
+             'data': _HI_YA_JSON,
              }
         )
         after_request.assert_called_once_with(response)
@@ -405,15 +450,9 @@ class TestClient(TestCase):
     @patch('wac.requests.post')
     def test_exception_request_handlers(self, f):
         ex = wac.requests.HTTPError()
-        ex.response = Mock()
-        ex.response.status_code = 402
-        ex.response.content = (
-            '{"status": "Bad Request", "status_code": '
-            '"400", "description": "Invalid field \'your mom\' -- make '
-            'sure its your dad too", "additional": "nothing personal"}')
-        ex.response.headers = {
-            'Content-Type': 'application/json',
-        }
+        ex.response = _mock_response(
+            _JSON_HEADERS, _BAD_REQUEST_BODY_ADDL,
+            status_code=402)
         f.__name__ = 'post'
         f.side_effect = ex
         before_request = Mock()
@@ -424,15 +463,15 @@ class TestClient(TestCase):
             self.cli.config.before_request.append(before_request)
             self.cli.config.after_request.append(after_request)
             with self.assertRaises(wac.Error) as ex_ctx:
-                self.cli.post('/a/post/w/hooks', data={'hi': 'ya'})
+                self.cli.post('/a/post/w/hooks', data=_HI_YA)
         self.assertEqual(ex_ctx.exception.status_code, 402)
         self.assertEqual(ex_ctx.exception.additional, 'nothing personal')
         before_request.assert_called_once_with(
             'POST',
             '/test/a/post/w/hooks',
-            {'headers': {'Content-Type': 'application/json'},
+            {'headers': _JSON_HEADERS,
              'allow_redirects': False,
-             'data': '{"hi": "ya"}',
+             'data': _HI_YA_JSON,
              }
         )
         after_request.assert_called_once_with(ex.response)
@@ -441,141 +480,65 @@ class TestClient(TestCase):
     @patch('wac.Client._op')
     def test_keep_alive(self, op, session):
         ka_client = wac.Client()
-        ka_client.config = default_config
-        ka_client.config.root_url = 'https://www.google.com'
+        ka_client.config = wac.Config('https://www.google.com')
         ka_client.get('/grapes')
         args, _ = op.call_args
         self.assertEqual(args, (session.return_value.get, '/grapes'))
 
+    @patch('requests.session')
+    @patch('wac.Client._op')
+    def test_shared_session(self, op, session):
+        shared = Mock()
+        clients = [wac.Client(session=shared) for _ in xrange(2)]
+        for client in clients:
+            client.config = wac.Config('https://www.google.com')
+            client.get('/grapes')
+        self.assertFalse(session.called)
+        self.assertEqual(2, op.call_count)
+        for args, _ in op.call_args_list:
+            self.assertEqual(args, (shared.get, '/grapes'))
+
 
 class TestPage(TestCase):
 
     @patch('wac.requests.get')
     def test_create(self, get):
         get.__name__ = 'get'
-        with patch.object(Resource.client, 'config') as config:
-            config.root_url = 'http://ex.com'
-            config.echo = False
-            config.allow_redirects = False
-            config.keep_alive = True
-            config.auth = ('bob', 'passwerd')
-            response = get.return_value
-            data = {
-                '_type': 'page',
-                '_uris': {
-                    'first_uri': {
-                        '_type': 'page',
-                        'key': 'first',
-                    },
-                    'previous_uri': {
-                        '_type': 'page',
-                        'key': 'previous',
-                    },
-                    'next_uri': {
-                        '_type': 'page',
-                        'key': 'next',
-                    },
-                    'last_uri': {
-                        '_type': 'page',
-                        'key': 'last',
-                    },
-                },
-                'uri': '/a/uri',
-                'first_uri': '/a/uri/first',
-                'previous_uri': '/a/uri/prev',
-                'next_uri': '/a/uri/next',
-                'last_uri': '/a/uri/last',
-                'total': 100,
-                'offset': 44,
-                'limit': 2,
-                'items': [
-                    {'a': 'b', 'one': 2},
-                    {'a': 'c', 'one': 3},
-                ],
-            }
-            response.headers = {
-                'Content-Type': 'application/json',
-            }
-            response.content = to_json(data)
-            page = wac.Page(Resource, **data)
+        with _configured(
+                Resource.client, 'http://ex.com', auth=('bob', 'passwerd')):
+            get.return_value = _mock_response(
+                _JSON_HEADERS, _PAGE_JSON)
+            page = wac.Page(Resource, **_PAGE_DATA)
 
     def test_links(self):
         with patch.object(Resource1.client, '_op') as _op:
             resp = _op.return_value = Mock()
 
-            common_data = {
-                '_type': 'page',
-                '_uris': {
-                    'first_uri': {
-                        '_type': 'page',
-                        'key': 'first',
-                    },
-                    'previous_uri': {
-                        '_type': 'page',
-                        'key': 'previous',
-                    },
-                    'next_uri': {
-                        '_type': 'page',
-                        'key': 'next',
-                    },
-                    'last_uri': {
-                        '_type': 'page',
-                        'key': 'last',
-                    },
-                },
-                'first_uri': '/a/uri/first',
-                'previous_uri': '/a/uri/prev',
-                'next_uri': '/a/uri/next',
-                'last_uri': '/a/uri/last',
-                'total': 100,
-                'offset': 44,
-                'limit': 2,
-                'items': [
-                ],
-            }
-            data = {
-                'uri': '/a/uri',
-            }
-            data.update(common_data)
+            data = dict(_COMMON_PAGE_DATA, uri='/a/uri')
             resp.data = data
             page = wac.Page(Resource, **data)
 
-            _op.return_value = Mock(
-                headers={
-                    'Content-Type': 'application/json',
-                })
+            _op.return_value = Mock(headers=_JSON_HEADERS)
 
-            data = {
-                'uri': '/a/uri/first',
-            }
-            data.update(common_data)
+            data = dict(_COMMON_PAGE_DATA, uri='/a/uri/first')
             _op.return_value.data = data
             link = page.first
             self.assertEqual(link.uri, '/a/uri/first')
             self.assertEqual(link.resource_cls, page.resource_cls)
 
-            data = {
-                'uri': '/a/uri/prev',
-            }
-            data.update(common_data)
+            data = dict(_COMMON_PAGE_DATA, uri='/a/uri/prev')
             _op.return_value.data = data
             link = page.previous
             self.assertEqual(link.uri, '/a/uri/prev')
             self.assertEqual(link.resource_cls, page.resource_cls)
 
-            data = {
-                'uri': '/a/uri/next',
-            }
-            data.update(common_data)
+            data = dict(_COMMON_PAGE_DATA, uri='/a/uri/next')
             _op.return_value.data = data
             link = page.next
             self.assertEqual(link.uri, '/a/uri/next')
             self.assertEqual(link.resource_cls, page.resource_cls)
 
-            data = {
-                'uri': '/a/uri/last',
-            }
-            data.update(common_data)
+            data = dict(_COMMON_PAGE_DATA, uri='/a/uri/last')
             _op.return_value.data = data
             link = page.last
             self.assertEqual(link.uri, '/a/uri/last')
@@ -586,12 +549,9 @@ class TestPage(TestCase):
             _op.reset_mock()
 
             resp = _op.return_value
-            data = {
-                'uri': '/a/uri',
-            }
-            data.update(common_data)
-            data['previous_uri'] = None
-            data['next_uri'] = None
+            data = dict(
+                _COMMON_PAGE_DATA,
+                uri='/a/uri', previous_uri=None, next_uri=None)
             resp.data = data
             page = wac.Page(Resource, **data)
 
@@ -619,19 +579,12 @@ class TestPagination(TestCase):
 
     @patch('wac.Page')
     def test_links(self, Page):
-        page1 = Mock()
-        page1.items = [1, 2, 3]
-        page2 = Mock()
-        page2.items = [4, 5, 6]
-        page3 = Mock()
-        page3.items = [7, 8]
-        page1.previous = None
-        page1.next = page2
-        page2.previous = page1
-        page2.next = page3
-        page3.previous = page2
-        page3.next = None
-
+        pages = [
+            FakePage(items=items) for items in ([1, 2, 3], [4, 5, 6], [7, 8])
+        ]
+        for prev, cur, nxt in zip([None] + pages, pages, pages[1:] + [None]):
+            cur.previous, cur.next = prev, nxt
+        page1, page2, page3 = pages
 
         Page.return_value = page1
         uri = '/a/uri'
@@ -657,7 +610,7 @@ class TestPagination(TestCase):
     @patch.object(wac.Pagination, '_page')
     @patch('wac.Page')
     def test_count(self, Page, _page):
-        page1 = Mock(items=[1, 2, 3], total=8)
+        page1 = FakePage(items=[1, 2, 3], total=8)
 
         def _page_patch(key, size=None):
             return [page1][key]
@@ -666,22 +619,80 @@ class TestPagination(TestCase):
 
         uri = '/a/uri'
         pagination = wac.Pagination(None, uri, 6, None)
-        expected_count = int(math.ceil(page1.total / pagination.size))
+        expected_count = -(-page1.total // pagination.size)
         self.assertEqual(pagination.count(), expected_count)
         _page.assert_called_once_with(0, 1)
 
+    @patch.object(wac.Pagination, '_fetch')
+    def test_page_size(self, _fetch):
+        pagination = wac.Pagination(Resource1, '/a/uri', 6)
+        pagination._page(2)
+        _fetch.assert_called_once_with(12, 6)
+        _fetch.reset_mock()
+        pagination._page(2, 1)
+        _fetch.assert_called_once_with(12, 1)
+
+    @patch.object(wac.Pagination, '_fetch')
+    def test_page_cache(self, _fetch):
+        _fetch.side_effect = lambda offset, limit: FakePage(offset=offset)
+        pagination = wac.Pagination(Resource1, '/a/uri', 3)
+        page = pagination._page(1)
+        self.assertIs(page, pagination._page(1))
+        self.assertEqual(1, _fetch.call_count)
+        for key in xrange(2, 2 + pagination.cache_size):
+            pagination._page(key)
+        _fetch.reset_mock()
+        pagination._page(1)
+        _fetch.assert_called_once_with(3, 3)
+
+        # unbounded
+        _fetch.reset_mock()
+        pagination = wac.Pagination(Resource1, '/a/uri', 3, cache_size=None)
+        for key in xrange(10):
+            pagination._page(key)
+        for key in xrange(10):
+            pagination._page(key)
+        self.assertEqual(10, _fetch.call_count)
+
+        # disabled
+        _fetch.reset_mock()
+        pagination = wac.Pagination(Resource1, '/a/uri', 3, cache_size=0)
+        pagination._page(1)
+        pagination._page(1)
+        self.assertEqual(2, _fetch.call_count)
+
+    @patch.object(wac.Pagination, '_fetch')
+    def test_first_refetches(self, _fetch):
+        version = [0]
+        _fetch.side_effect = lambda offset, limit: FakePage(
+            items=[version[0]] * limit, offset=offset, total=9)
+        pagination = wac.Pagination(Resource1, '/a/uri', 3)
+        pagination._page(1)
+        self.assertEqual([0, 0, 0], pagination.first().items)
+        version[0] = 1
+        # starting over drops every cached page
+        self.assertEqual([1, 1, 1], pagination.first().items)
+        self.assertEqual([1, 1, 1], pagination._page(1).items)
+        # probes are never cached
+        version[0] = 2
+        self.assertEqual([2], pagination._page(0, 1).items)
+        _fetch.reset_mock()
+        pagination._page(0, 1)
+        self.assertEqual(1, _fetch.call_count)
+
     def test_count_cached(self):
         page1 = wac.Page(Resource1, **dict(total=101, items=[]))
         uri = '/a/uri'
         pagination = wac.Pagination(None, uri, 6, page1)
-        expected_count = int(math.ceil(page1.total / pagination.size))
+        expected_count = -(-page1.total // pagination.size)
         self.assertEqual(pagination.count(), expected_count)
 
     @patch.object(wac.Pagination, '_page')
     def test_index(self, _page):
-        page1 = Mock(items=[1, 2, 3], total=8)
-        page2 = Mock(items=[4, 5, 6], total=8)
-        page3 = Mock(items=[7, 8], total=8)
+        page1, page2, page3 = [
+            FakePage(items=items, total=8)
+            for items in ([1, 2, 3], [4, 5, 6], [7, 8])
+        ]
 
         def _page_patch(key):
             return [page1, page2, page3][key]
@@ -711,9 +722,10 @@ class TestPagination(TestCase):
 
     @patch.object(wac.Pagination, '_page')
     def test_slice(self, _page):
-        page1 = Mock(items=[1, 2, 3], total=8)
-        page2 = Mock(items=[4, 5, 6], total=8)
-        page3 = Mock(items=[7, 8], total=8)
+        page1, page2, page3 = [
+            FakePage(items=items, total=8)
+            for items in ([1, 2, 3], [4, 5, 6], [7, 8])
+        ]
 
         def _page_patch(key, data=None):
             return [page1, page2, page3][key]
@@ -733,18 +745,13 @@ class TestPagination(TestCase):
         self.assertEqual(pages[3:2:12], pagination[3:2:12])
 
     def test_iter(self):
-        page1 = Mock()
-        page1.items = [1, 2, 3]
-        page2 = Mock()
-        page2.items = [4, 5, 6]
-        page3 = Mock()
-        page3.items = [7, 8]
-        page4 = Mock()
-        page4.items = [9]
-        page1.next = page2
-        page2.next = page3
-        page3.next = page4
-        page4.next = None
+        pages = [
+            FakePage(items=items)
+            for items in ([1, 2, 3], [4, 5, 6], [7, 8], [9])
+        ]
+        for prev, cur, nxt in zip([None] + pages, pages, pages[1:] + [None]):
+            cur.previous, cur.next = prev, nxt
+        page1, page2, page3, page4 = pages
 
         with patch.object(Resource1.client, '_op') as _op:
             with patch.object(Resource1, 'page_cls') as page_cls:
@@ -765,6 +772,163 @@ class TestPagination(TestCase):
                 pages = [p for p in pagination]
                 self.assertEqual([page2, page3, page4], pages)
 
+    @requires_futures
+    def test_iter_prefetch(self):
+        pages = [
+            FakePage(items=items) for items in ([1, 2, 3], [4, 5, 6], [7, 8])
+        ]
+        page1, page2, page3 = pages
+        page1.next = page2
+        page2.next = '/a/uri?offset=6'
+        root_urls = []
+
+        def get(client, uri):
+            root_urls.append(client.config.root_url)
+            return Mock(data={})
+
+        with patch.object(Client, 'get', autospec=True) as get_patch:
+            get_patch.side_effect = get
+            with patch.object(Resource1, 'page_cls', return_value=page3):
+                with Resource1.client:
+                    Resource1.client.config.root_url = '/prefetched'
+                    pagination = wac.Pagination(
+                        Resource1, '/a/uri', 3, page1, prefetch=True)
+                    self.assertEqual(pages, list(pagination))
+        # the fetch ran in a worker but with the caller's config
+        self.assertEqual(['/prefetched'], root_urls)
+
+    @requires_futures
+    def test_iter_prefetch_cancel(self):
+        submitted = []
+
+        class QueuedPool(object):
+
+            def submit(self, fn, *args):
+                submitted.append(wac.futures.Future())
+                return submitted[-1]
+
+        previous = wac.set_io_pool(QueuedPool())
+        self.addCleanup(wac.set_io_pool, previous)
+        page = FakePage(items=[1, 2, 3], next='/a/uri?offset=3')
+
+        pagination = wac.Pagination(Resource1, '/a/uri', 3, page, prefetch=1)
+        pages = iter(pagination)
+        next(pages)
+        pagination.close()
+        self.assertTrue(submitted[-1].cancelled())
+
+        # abandoning the iteration cancels it too
+        pagination = wac.Pagination(Resource1, '/a/uri', 3, page, prefetch=1)
+        pages = iter(pagination)
+        next(pages)
+        pages.close()
+        self.assertTrue(submitted[-1].cancelled())
+        self.assertEqual(set(), pagination._iter_pending)
+
+    @requires_futures
+    @patch.object(Client, 'get', autospec=True)
+    @patch.object(wac.Pagination, '_fetch')
+    def test_iter_prefetch_requests(self, _fetch, get):
+        items = _ITEMS_1_TO_8
+
+        def _fetch_patch(offset, limit):
+            nxt = offset + limit
+            return FakePage(
+                items=items[offset:nxt], offset=offset, total=8,
+                next='/a/uri?offset={0}'.format(nxt) if nxt < 8 else None)
+
+        _fetch.side_effect = _fetch_patch
+        q = wac.Query(Resource1, '/a/uri', 3, prefetch=2)
+        self.assertEqual(items, list(q))
+        # each page once, prefetched pages are not followed by link again
+        self.assertCountEqual(
+            [((0, 3),), ((3, 3),), ((6, 3),)], _fetch.call_args_list)
+        self.assertFalse(get.called)
+
+    @requires_futures
+    @patch.object(wac.Pagination, '_page')
+    def test_iter_prefetch_nested(self, _page):
+        page1, page2, page3 = [
+            FakePage(items=items, total=8)
+            for items in ([1, 2, 3], [4, 5, 6], [7, 8])
+        ]
+        page1.next, page2.next = page2, page3
+        _page.return_value = page1
+
+        q = wac.Query(Resource1, '/rs', 3, prefetch=True)
+        self.assertEqual(
+            [(a, b) for a in _ITEMS_1_TO_8 for b in _ITEMS_1_TO_8],
+            [(a, b) for a in q for b in q])
+        self.assertEqual(set(), q.pagination._iter_pending)
+
+    @requires_futures
+    @patch.object(wac.Pagination, '_fetch')
+    def test_page_prefetch(self, _fetch):
+        started = []
+        lock = threading.Lock()
+        all_started = threading.Event()
+
+        def _fetch_patch(offset, limit):
+            if offset:
+                with lock:
+                    started.append(offset)
+                    if len(started) == 3:
+                        all_started.set()
+                # only returns once all prefetches are in flight together
+                all_started.wait(5)
+            return FakePage(items=[offset], offset=offset)
+
+        _fetch.side_effect = _fetch_patch
+        with wac.Pagination(Resource1, '/a/uri', 3, prefetch=3) as pagination:
+            self.assertEqual([0], pagination._page(0).items)
+            self.assertTrue(all_started.wait(5))
+            self.assertCountEqual([3, 6, 9], started)
+            self.assertEqual([3], pagination._page(1).items)
+        self.assertEqual({}, pagination._pending)
+
+    def test_io_pool_size(self):
+        for value, expected in [
+                (None, 16), ('4', 4), ('0', 16), ('-2', 16), ('lots', 16)]:
+            env = {} if value is None else {'WAC_IO_THREADS': value}
+            with patch.dict(os.environ, env):
+                if value is None:
+                    os.environ.pop('WAC_IO_THREADS', None)
+                self.assertEqual(expected, wac._io_pool_size())
+
+    @requires_futures
+    @patch.object(wac.Pagination, '_fetch')
+    def test_io_pool(self, _fetch):
+
+        class InlinePool(object):
+
+            def __init__(self):
+                self.submitted = 0
+
+            def submit(self, fn, *args):
+                self.submitted += 1
+                future = wac.futures.Future()
+                future.set_result(fn(*args))
+                return future
+
+        _fetch.side_effect = lambda offset, limit: FakePage(offset=offset)
+        pool = InlinePool()
+        previous = wac.set_io_pool(pool)
+        self.addCleanup(wac.set_io_pool, previous)
+        pagination = wac.Pagination(Resource1, '/a/uri', 3, prefetch=2)
+        pagination._page(0)
+        self.assertEqual(2, pool.submitted)
+        self.assertEqual(
+            [((0, 3),), ((3, 3),), ((6, 3),)], _fetch.call_args_list)
+
+        # the page just fetched bounds the window, even before `first` has
+        # recorded it as current
+        _fetch.reset_mock()
+        _fetch.side_effect = lambda offset, limit: FakePage(
+            offset=offset, total=2)
+        pagination = wac.Pagination(Resource1, '/a/uri', 10, prefetch=3)
+        pagination.first()
+        _fetch.assert_called_once_with(0, 10)
+
     @patch.object(wac.Pagination, '_page')
     def test_first(self, _page):
 
@@ -775,8 +939,8 @@ class TestPagination(TestCase):
 
         # multiple
         pages = [
-            Mock(items=[1, 2, 3], total=5),
-            Mock(items=[4, 5], total=5),
+            FakePage(items=[1, 2, 3], total=5),
+            FakePage(items=[4, 5], total=5),
         ]
         uri = '/a/uri'
         pagination = wac.Pagination(None, uri, 3)
@@ -785,7 +949,7 @@ class TestPagination(TestCase):
 
         # one
         pages = [
-            Mock(items=[1, 2, 3], total=3),
+            FakePage(items=[1, 2, 3], total=3),
         ]
         uri = '/a/uri'
         pagination = wac.Pagination(None, uri, 3)
@@ -805,41 +969,38 @@ class TestQuery(TestCase):
 
         uri = '/a/uri?a[in]=1,2&a[>]=c&b=hiya&d[endswith]=bye'
         q = wac.Query(None, uri, 25)
-        self.assertEqual(
-            urllib.unquote(q._qs()), 'a[>]=c&b=hiya&d[endswith]=bye&a[in]=1,2')
+        self.assertTrue(
+            _qs_eq(q._qs(), 'a[>]=c&b=hiya&d[endswith]=bye&a[in]=1,2'))
 
     def test_filter(self):
         uri = '/a/uri'
         q = wac.Query(None, uri, 25)
-        q.filter(Resource1.f.a == 'b')
-        self.assertEqual(q.filters[-1], ('a', 'b'))
-        q.filter(Resource1.f.a != '101')
-        self.assertEqual(q.filters[-1], ('a[!=]', '101'))
-        q.filter(Resource1.f.b < 4)
-        self.assertEqual(q.filters[-1], ('b[<]', '4'))
-        q.filter(Resource1.f.b <= 5)
-        self.assertEqual(q.filters[-1], ('b[<=]', '5'))
-        q.filter(Resource1.f.c > 123)
-        self.assertEqual(q.filters[-1], ('c[>]', '123'))
-        q.filter(Resource1.f.c >= 44)
-        self.assertEqual(q.filters[-1], ('c[>=]', '44'))
-        q.filter(Resource1.f.d.in_(1, 2, 3))
-        self.assertEqual(q.filters[-1], ('d[in]', '1,2,3'))
-        q.filter(~Resource1.f.d.in_(6, 33, 55))
-        self.assertEqual(q.filters[-1], ('d[!in]', '6,33,55'))
-        q.filter(Resource1.f.e.contains('it'))
-        self.assertEqual(q.filters[-1], ('e[contains]', 'it'))
-        q.filter(~Resource1.f.e.contains('soda'))
-        self.assertEqual(q.filters[-1], ('e[!contains]', 'soda'))
-        q.filter(Resource1.f.f.startswith('la'))
-        self.assertEqual(q.filters[-1], ('f[startswith]', 'la'))
-        q.filter(Resource1.f.f.endswith('lo'))
-        self.assertEqual(q.filters[-1], ('f[endswith]', 'lo'))
-        self.assertEqual(
-            urllib.unquote(q._qs()),
-            'a=b&a[!=]=101&b[<]=4&b[<=]=5&c[>]=123&c[>=]=44&d[in]=1,2,3&'
+        f = Resource1.f
+        fa, fb, fc, fd, fe, ff = f.a, f.b, f.c, f.d, f.e, f.f
+        self.assertIs(Resource1.f.a, fa)
+        self.assertIs(Resource1.f.a.b, fa.b)
+        self.assertEqual('a.b', fa.b.name)
+        for expression, expected in [
+            (fa == 'b', ('a', 'b')),
+            (fa != '101', ('a[!=]', '101')),
+            (fb < 4, ('b[<]', '4')),
+            (fb <= 5, ('b[<=]', '5')),
+            (fc > 123, ('c[>]', '123')),
+            (fc >= 44, ('c[>=]', '44')),
+            (fd.in_(1, 2, 3), ('d[in]', '1,2,3')),
+            (~fd.in_(6, 33, 55), ('d[!in]', '6,33,55')),
+            (fe.contains('it'), ('e[contains]', 'it')),
+            (~fe.contains('soda'), ('e[!contains]', 'soda')),
+            (ff.startswith('la'), ('f[startswith]', 'la')),
+            (ff.endswith('lo'), ('f[endswith]', 'lo')),
+        ]:
+            q.filter(expression)
+            self.assertEqual(q.filters[-1], expected)
+        self.assertTrue(_qs_eq(
+            q._qs(),
+            'a=b&a[!%3D]=101&b[<]=4&b[<%3D]=5&c[>]=123&c[>%3D]=44&d[in]=1,2,3&'
             'd[!in]=6,33,55&e[contains]=it&e[!contains]=soda&f[startswith]=la&'
-            'f[endswith]=lo')
+            'f[endswith]=lo'))
 
     def test_sort(self):
         uri = '/a/uri'
@@ -848,13 +1009,13 @@ class TestQuery(TestCase):
         self.assertEqual(q.sorts[-1], ('sort', 'me,asc'))
         q.sort(Resource1.f.u.desc())
         self.assertEqual(q.sorts[-1], ('sort', 'u,desc'))
-        self.assertEqual(urllib.unquote(q._qs()), 'sort=me,asc&sort=u,desc')
+        self.assertTrue(_qs_eq(q._qs(), 'sort=me,asc&sort=u,desc'))
 
     @patch.object(wac.Pagination, '_page')
     def test_all(self, _page):
-        page1 = Mock(items=[1, 2, 3], total=8)
-        page2 = Mock(items=[4, 5, 6], total=8)
-        page3 = Mock(items=[7, 8], total=8)
+        page1 = FakePage(items=[1, 2, 3], total=8)
+        page2 = FakePage(items=[4, 5, 6], total=8)
+        page3 = FakePage(items=[7, 8], total=8)
         page1.previous = None
         page1.next = page2
         page2.previous = page1
@@ -870,11 +1031,79 @@ class TestQuery(TestCase):
 
         uri = '/ur/is'
         q = wac.Query(Resource1, uri, 3)
-        expected_items = range(1, 9)
         items = q.all()
-        self.assertEqual(expected_items, items)
+        self.assertEqual(_ITEMS_1_TO_8, items)
         self.assertEqual(q.pagination.current, page1)
 
+    @requires_futures
+    @patch.object(wac.Pagination, '_fetch')
+    @patch.object(wac.Pagination, '_page')
+    def test_all_parallel(self, _page, _fetch):
+        items = _ITEMS_1_TO_8
+        _page.return_value = FakePage(items=items[:3], total=8, offset=0)
+        _fetch.side_effect = lambda offset, limit: FakePage(
+            items=items[offset:offset + limit], total=8, offset=offset)
+
+        q = wac.Query(Resource1, '/ur/is', 3)
+        self.assertEqual(items, q.all(parallelism=2))
+        _page.assert_called_once_with(0)
+        self.assertCountEqual(
+            [((3, 3),), ((6, 2),)], _fetch.call_args_list)
+
+        # a server capping the page size is stepped through by that cap
+        items = list(range(1, 10))
+        _page.return_value = FakePage(items=items[:2], total=9, offset=0)
+        _fetch.reset_mock()
+        _fetch.side_effect = lambda offset, limit: FakePage(
+            items=items[offset:offset + min(limit, 2)], total=9,
+            offset=offset)
+        q = wac.Query(Resource1, '/ur/is', 3)
+        self.assertEqual(items, q.all(parallelism=2))
+        self.assertCountEqual(
+            [((2, 2),), ((4, 2),), ((6, 2),), ((8, 1),)],
+            _fetch.call_args_list)
+
+        # without a total the pages are followed one after another
+        _page.return_value = FakePage(items=items[:3], total=None, offset=0)
+        _fetch.reset_mock()
+        q = wac.Query(Resource1, '/ur/is', 3)
+        with patch.object(wac.Pagination, '__iter__') as it:
+            it.return_value = iter([_page.return_value])
+            self.assertEqual(items[:3], q.all(parallelism=2))
+        self.assertFalse(_fetch.called)
+
+    @requires_futures
+    @patch.object(wac.Pagination, '_fetch')
+    @patch.object(wac.Pagination, '_page')
+    def test_slice_parallel(self, _page, _fetch):
+        items = _ITEMS_1_TO_8
+        cap = [5]
+        _page.return_value = FakePage(items=items[:3], total=8, offset=0)
+        _fetch.side_effect = lambda offset, limit: FakePage(
+            items=items[offset:offset + min(limit, cap[0])], total=8,
+            offset=offset)
+
+        q = wac.Query(Resource1, '/ur/is', 3, parallelism=2)
+        self.assertEqual(items[1:7], q[1:7])
+        self.assertCountEqual(
+            [((3, 3),), ((6, 1),)], _fetch.call_args_list)
+
+        # a capped page finishes the range serially
+        _fetch.reset_mock()
+        cap[0] = 2
+        self.assertEqual(items[1:7], q[1:7])
+        self.assertCountEqual(
+            [((3, 3),), ((6, 1),), ((5, 2),)],
+            _fetch.call_args_list)
+
+        # steps wider than a page fetch only the selected items
+        _fetch.reset_mock()
+        self.assertEqual(items[::4], q[::4])
+        self.assertEqual(items[6::-4], q[6::-4])
+        self.assertCountEqual(
+            [((0, 1),), ((4, 1),), ((6, 1),), ((2, 1),)],
+            _fetch.call_args_list)
+
     @patch.object(wac.Pagination, '_page')
     def test_one(self, _page):
 
@@ -884,7 +1113,7 @@ class TestQuery(TestCase):
         _page.side_effect = _page_patch
 
         # none
-        pages = [Mock(items=[], total=0, offset=0, fetched=False)]
+        pages = [FakePage(items=[], total=0, offset=0, fetched=False)]
         uri = '/ur/is'
         q = wac.Query(Resource1, uri, 3)
         _page.reset_mock()
@@ -894,7 +1123,7 @@ class TestQuery(TestCase):
         _page.reset_mock()
 
         # multiple
-        pages = [Mock(items=[1, 2, 3], total=3, offset=0, fetched=False)]
+        pages = [FakePage(items=[1, 2, 3], total=3, offset=0, fetched=False)]
         uri = '/ur/is'
         q = wac.Query(Resource1, uri, 3)
         _page.reset_mock()
@@ -904,7 +1133,7 @@ class TestQuery(TestCase):
         _page.reset_mock()
 
         # one
-        pages = [Mock(items=['one'], total=1, offset=0, fetched=False)]
+        pages = [FakePage(items=['one'], total=1, offset=0, fetched=False)]
         uri = '/ur/is'
         q = wac.Query(Resource1, uri, 3)
         _page.reset_mock()
@@ -913,11 +1142,25 @@ class TestQuery(TestCase):
         self.assertEqual(_page.call_count, 1)
         _page.reset_mock()
 
+    @patch.object(wac.Pagination, '_page')
+    def test_one_nonstrict(self, _page):
+        _page.return_value = FakePage(items=[1], total=3, offset=0)
+        q = wac.Query(Resource1, '/ur/is', 3)
+        self.assertEqual(q.one(strict=False), 1)
+        _page.assert_called_once_with(0, 1)
+
+        _page.reset_mock()
+        _page.return_value = FakePage(items=[], total=0, offset=0)
+        q = wac.Query(Resource1, '/ur/is', 3)
+        with self.assertRaises(wac.NoResultFound):
+            q.one(strict=False)
+        _page.assert_called_once_with(0, 1)
+
     @patch.object(wac.Pagination, '_page')
     def test_one_cached(self, _page):
 
         # none
-        page = Mock(items=[], offset=0, total=0, fetched=True)
+        page = FakePage(items=[], offset=0, total=0, fetched=True)
         _page.return_value = page
         uri = '/ur/is'
         q = wac.Query(Resource1, uri, 3)
@@ -927,7 +1170,7 @@ class TestQuery(TestCase):
         _page.assert_called_once_with(0, 2)
 
         # multiple
-        page = Mock(items=[1, 2, 3], offset=0, total=3, fetched=True)
+        page = FakePage(items=[1, 2, 3], offset=0, total=3, fetched=True)
         _page.return_value = page
         uri = '/ur/is'
         q = wac.Query(Resource1, uri, 3)
@@ -937,7 +1180,7 @@ class TestQuery(TestCase):
         _page.assert_called_once_with(0, 2)
 
         # one
-        page = Mock(items=['one'], offset=0, total=1, fetched=True)
+        page = FakePage(items=['one'], offset=0, total=1, fetched=True)
         _page.return_value = page
         uri = '/ur/is'
         q = wac.Query(Resource1, uri, 3)
@@ -948,9 +1191,9 @@ class TestQuery(TestCase):
 
     @patch.object(wac.Pagination, '_page')
     def test_first(self, _page):
-        page1 = Mock(items=[1, 2, 3], total=8)
-        page2 = Mock(items=[4, 5, 6], total=8)
-        page3 = Mock(items=[7, 8], total=8)
+        page1 = FakePage(items=[1, 2, 3], total=8)
+        page2 = FakePage(items=[4, 5, 6], total=8)
+        page3 = FakePage(items=[7, 8], total=8)
         page1.previous = None
         page1.next = page2
         page2.previous = page1
@@ -968,10 +1211,11 @@ class TestQuery(TestCase):
         expected_item = 1
         item = q.first()
         self.assertEqual(expected_item, item)
+        _page.assert_called_once_with(0, 1)
 
     @patch.object(wac.Pagination, '_page')
     def test_first_cached(self, _page):
-        page = Mock(items=[1, 2, 3], offset=0, total=3)
+        page = FakePage(items=[1, 2, 3], offset=0, total=3)
         _page.return_value = page
         uri = '/ur/is'
         q = wac.Query(Resource1, uri, 3)
@@ -983,7 +1227,7 @@ class TestQuery(TestCase):
     @patch.object(wac.Pagination, '_page')
     @patch('wac.Page')
     def test_count(self, Page, _page):
-        page1 = Mock(items=[1, 2, 3], total=8)
+        page1 = FakePage(items=[1, 2, 3], total=8)
 
         def _page_patch(key, data=None):
             return [page1][key]
@@ -995,12 +1239,28 @@ class TestQuery(TestCase):
         expected_count = 8
         count = q.count()
         self.assertEqual(expected_count, count)
+        _page.assert_called_once_with(0)
+
+    @patch.object(wac.Pagination, '_page')
+    def test_count_then_iter(self, _page):
+        page1, page2, page3 = [
+            FakePage(items=items, total=8, offset=offset)
+            for items, offset in (([1, 2, 3], 0), ([4, 5, 6], 3), ([7, 8], 6))
+        ]
+        page1.next, page2.next = page2, page3
+        _page.return_value = page1
+
+        q = wac.Query(Resource1, '/ur/is', 3)
+        self.assertEqual(8, q.count())
+        self.assertEqual(_ITEMS_1_TO_8, list(q))
+        _page.assert_called_once_with(0)
 
     @patch.object(wac.Pagination, '_page')
     def test_index(self, _page):
-        page1 = Mock(items=[1, 2, 3], total=8)
-        page2 = Mock(items=[4, 5, 6], total=8)
-        page3 = Mock(items=[7, 8], total=8)
+        page1, page2, page3 = [
+            FakePage(items=items, total=8)
+            for items in ([1, 2, 3], [4, 5, 6], [7, 8])
+        ]
 
         def _page_patch(key, data=None):
             return [page1, page2, page3][key]
@@ -1009,45 +1269,57 @@ class TestQuery(TestCase):
 
         uri = '/ur/is'
         q = wac.Query(Resource1, uri, 3)
-        expected_items = range(1, 9)
         for i in xrange(q.count()):
-            self.assertEqual(q[i], expected_items[i])
+            self.assertEqual(q[i], _ITEMS_1_TO_8[i])
 
     @patch.object(wac.Pagination, '_page')
     def test_slice(self, _page):
-        page1 = Mock(items=[1, 2, 3], total=8)
-        page2 = Mock(items=[4, 5, 6], total=8)
-        page3 = Mock(items=[7, 8], total=8)
+        page1, page2, page3 = [
+            FakePage(items=items, total=8, offset=offset)
+            for items, offset in (([1, 2, 3], 0), ([4, 5, 6], 3), ([7, 8], 6))
+        ]
 
         def _page_patch(key, data=None):
             return [page1, page2, page3][key]
 
         _page.side_effect = _page_patch
 
+        items = _ITEMS_1_TO_8
+
+        def _fetch_patch(offset, limit):
+            # server caps limit at 5
+            return FakePage(
+                items=items[offset:offset + min(limit, 5)], total=8,
+                offset=offset)
+
         uri = '/ur/is'
         q = wac.Query(Resource1, uri, 3)
-        items = range(1, 9)
-        self.assertEqual(q[:], items[:])
-        self.assertEqual(q[::-1], items[::-1])
-        self.assertEqual(q[6:4], items[6:4])
-        self.assertEqual(q[6:4:12], items[6:4:12])
-        self.assertEqual(q[2:7:2], items[2:7:2])
-        self.assertEqual(q[6:1:-2], items[6:1:-2])
+        with patch.object(wac.Pagination, '_fetch') as _fetch:
+            _fetch.side_effect = _fetch_patch
+            # the first page fetched by count is reused
+            self.assertEqual(q[0:3], items[0:3])
+            self.assertEqual(0, _fetch.call_count)
+            self.assertEqual(q[:], items[:])
+            _fetch.assert_called_once_with(3, 5)
+            _fetch.reset_mock()
+            self.assertEqual(q[2:7:2], items[2:7:2])
+            _fetch.assert_called_once_with(3, 4)
+            self.assertEqual(q[::-1], items[::-1])
+            self.assertEqual(q[6:4], items[6:4])
+            self.assertEqual(q[6:4:12], items[6:4:12])
+            self.assertEqual(q[6:1:-2], items[6:1:-2])
+            _fetch.reset_mock()
+            # steps wider than a page walk pages instead
+            self.assertEqual(q[::4], items[::4])
+            self.assertEqual(0, _fetch.call_count)
 
     def test_iter(self):
-        page1 = Mock()
-        page1.items = [0, 1, 2, 3]
-        page1.total = 10
-        page2 = Mock()
-        page2.items = [4, 5, 6, 7]
-        page2.total = 10
-        page3 = Mock()
-        page3.items = [8, 9]
-        page3.total = 10
+        page1 = FakePage(items=[0, 1, 2, 3], total=10)
+        page2 = FakePage(items=[4, 5, 6, 7], total=10)
+        page3 = FakePage(items=[8, 9], total=10)
 
         page1.next = page2
         page2.next = page3
-        page3.next = None
 
         with patch.object(Resource1, 'page_cls') as page_cls:
             with patch.object(Resource1.client, '_op') as _op:
@@ -1097,6 +1369,11 @@ class TestURIGen(TestCase):
         ]:
             self.assertEqual(apple_gen.member_uri(**kwargs), expected)
 
+    def test_escaped(self):
+        gen = wac.URIGen('big%20trees', '{tree}')
+        self.assertEqual(gen.collection_uri(), '/big%20trees')
+        self.assertEqual(gen.member_uri(tree=1), '/big%20trees/1')
+
     def test_root(self):
         tree_gen = wac.URIGen('trees', '{tree}')
         self.assertIsNotNone(tree_gen.root_uri)
@@ -1141,7 +1418,7 @@ class TestResource(TestCase):
 
     def _objectify_equal(self, o):
         # o
-        self.assertItemsEqual(
+        self.assertCountEqual(
             ['_type',
              '_uris',
              'uri',
@@ -1185,7 +1462,7 @@ class TestResource(TestCase):
                 'two': 'shoes',
                 'ones_uri': '/v33/1s',
             }
-            self.assertItemsEqual(
+            self.assertCountEqual(
                 o.one_3.__dict__.keys(),
                 ['ones_uri', '_type', '_uris', 'two', 'one'])
             resp.data = {
@@ -1198,7 +1475,7 @@ class TestResource(TestCase):
             self.assertEqual(o.one_3.ones.uri, '/v33/1s')
 
         # o.two
-        self.assertItemsEqual(
+        self.assertCountEqual(
             ['_type',
              '_uris',
              'uri',
@@ -1284,9 +1561,7 @@ class TestResource(TestCase):
             (wac.requests.post, '/v2/1s')
         )
         self.assertEqual(_op.call_args[1].keys(), ['headers', 'data'])
-        self.assertDictEqual(_op.call_args[1]['headers'], {
-            'Content-Type': 'application/json'
-        })
+        self.assertDictEqual(_op.call_args[1]['headers'], _JSON_HEADERS)
         self.assertDictEqual(json.loads(_op.call_args[1]['data']), {
             'test': 'one', 'two': 3, 'three': True,
         })
@@ -1298,8 +1573,8 @@ class TestResource(TestCase):
         _op.assert_called_once_with(
             wac.requests.put,
             '/v1/1s/heat',
-            headers={'Content-Type': 'application/json'},
-            data='{"guid": "heat"}')
+            headers=_JSON_HEADERS,
+            data=to_json({'guid': 'heat'}))
 
         _op.reset_mock()
         r = Resource1(name='blah')
@@ -1307,8 +1582,8 @@ class TestResource(TestCase):
         _op.assert_called_once_with(
             wac.requests.post,
             '/v2/1s',
-            headers={'Content-Type': 'application/json'},
-            data='{"name": "blah"}')
+            headers=_JSON_HEADERS,
+            data=to_json({'name': 'blah'}))
 
     @patch('wac.Client._op')
     def test_save_objectify(self, _op):
@@ -1395,8 +1670,8 @@ class TestResource(TestCase):
         _op.assert_called_once_with(
             wac.requests.put,
             '/v1/1s/eyedee',
-            headers={'Content-Type': 'application/json'},
-            data='{"guid": "eyedee"}')
+            headers=_JSON_HEADERS,
+            data=to_json({'guid': 'eyedee'}))
 
     @patch('wac.Client._op')
     def test_delete(self, _op):
@@ -1404,6 +1679,62 @@ class TestResource(TestCase):
         r.delete()
         _op.assert_called_once_with(wac.requests.delete, '/v1/1s/eyedee')
 
+    @patch('wac.Client._op')
+    def test_save_many(self, _op):
+        _op.side_effect = lambda f, uri, **kwargs: Mock(
+            data=dict(from_json(kwargs['data']), uri=uri + '/saved'))
+        rs = [Resource1(uri='/v1/1s/' + guid, guid=guid)
+              for guid in ('a', 'b', 'c')]
+        self.assertEqual(rs, Resource1.save_many(rs, parallelism=2))
+        self.assertEqual(
+            ['/v1/1s/a/saved', '/v1/1s/b/saved', '/v1/1s/c/saved'],
+            [r.uri for r in rs])
+        self.assertCountEqual(
+            [(wac.requests.put, '/v1/1s/' + guid) for guid in 'abc'],
+            [args for args, _ in _op.call_args_list])
+
+    @patch('wac.Client._op')
+    def test_delete_many(self, _op):
+        rs = [Resource1(uri='/v1/1s/' + guid, guid=guid)
+              for guid in ('a', 'b', 'c')]
+        Resource1.delete_many(rs, parallelism=2)
+        self.assertCountEqual(
+            [((wac.requests.delete, '/v1/1s/' + guid),) for guid in 'abc'],
+            _op.call_args_list)
+
+    @requires_futures
+    @patch('wac.Client._op')
+    def test_many_io_pool(self, _op):
+
+        class DeferredPool(object):
+
+            def __init__(self):
+                self.in_flight = self.most_in_flight = 0
+
+            def submit(self, fn, *args):
+                self.in_flight += 1
+                self.most_in_flight = max(self.most_in_flight, self.in_flight)
+                future = Mock()
+
+                def _result():
+                    self.in_flight -= 1
+                    return fn(*args)
+
+                future.result.side_effect = _result
+                return future
+
+        pool = DeferredPool()
+        previous = wac.set_io_pool(pool)
+        self.addCleanup(wac.set_io_pool, previous)
+        rs = [Resource1(uri='/v1/1s/' + guid, guid=guid) for guid in 'abcde']
+        Resource1.delete_many(rs, parallelism=2)
+        # runs on the shared executor with at most `parallelism` in flight
+        self.assertEqual(2, pool.most_in_flight)
+        self.assertEqual(0, pool.in_flight)
+        self.assertEqual(
+            [((wac.requests.delete, '/v1/1s/' + guid),) for guid in 'abcde'],
+            _op.call_args_list)
+
 
 class TestResourceCollection(TestCase):
 
@@ -1414,13 +1745,107 @@ class TestResourceCollection(TestCase):
         )
         resources = wac.ResourceCollection(Resource3, page.uri, page)
         q = resources.filter(Resource3.f.a.ilike('b'))
-        self.assertEqual(urllib.unquote(q._qs()), 'a[ilike]=b')
+        self.assertTrue(_qs_eq(q._qs(), 'a[ilike]=b'))
 
 
 class TestExample(TestCase):
 
-    def test_example(self):
+    @staticmethod
+    def _load():
         path = os.path.abspath(
             os.path.join(os.path.dirname(__file__), 'example.py')
         )
-        imp.load_source('example', path)
+        return imp.load_source('example', path)
+
+    def setUp(self):
+        super(TestExample, self).setUp()
+        self.example = self._load()
+        self.cli = self.example.Client()
+
+    def test_example(self):
+        self._load()
+
+    def test_deserialize_nested_at(self):
+        response = _mock_response(
+            {'Content-Type': 'application/json; charset=utf-8'},
+            to_json({
+                'created_at': '2013-01-02T03:04:05Z',
+                'meta': {'deleted_at': '2013-01-03T00:00:00Z'},
+                'items': [
+                    {'updated_at': '2013-01-04T00:00:00Z', 'name': 'at'},
+                    [{'seen_at': '2013-01-05T00:00:00Z'}],
+                ],
+                'format': 'not_at',
+            }))
+        data = self.cli._deserialize(response)
+        created_at = data['created_at']
+        self.assertEqual(
+            datetime.datetime(2013, 1, 2, 3, 4, 5),
+            created_at.replace(tzinfo=None))
+        self.assertEqual(datetime.timedelta(0), created_at.utcoffset())
+        self.assertEqual(3, data['meta']['deleted_at'].day)
+        self.assertEqual(4, data['items'][0]['updated_at'].day)
+        self.assertEqual('at', data['items'][0]['name'])
+        self.assertEqual(5, data['items'][1][0]['seen_at'].day)
+        self.assertEqual('not_at', data['format'])
+
+    def test_deserialize_without_at(self):
+        response = _mock_response(
+            _JSON_HEADERS, to_json({'format': 'flat', 'items': [{'a': 1}]}))
+        with patch.object(
+                self.example.Client, '_parse_deserialized') as parse:
+            data = self.cli._deserialize(response)
+        self.assertFalse(parse.called)
+        self.assertEqual({'format': 'flat', 'items': [{'a': 1}]}, data)
+
+    def test_deserialize_content_type(self):
+        response = _mock_response(
+            {'Content-Type': 'application/json; charset=utf-8'},
+            _HI_YA_JSON)
+        self.assertEqual(_HI_YA, self.cli._deserialize(response))
+        response = _mock_response({'Content-Type': 'text/html'}, b'<p/>')
+        with self.assertRaises(Exception) as ex_ctx:
+            self.cli._deserialize(response)
+        self.assertIn("'text/html'", str(ex_ctx.exception))
+
+    def test_convert_exception(self):
+        requests_ex = Mock(response=Mock(status_code=400, data={
+            'type': self.example.PlaylistError.EXPLODED,
+            'description': 'boom',
+        }))
+        ex = wac.Error(requests_ex)
+        converted = self.cli._convert_exception(ex)
+        self.assertIsInstance(converted, self.example.PlaylistError)
+        self.assertEqual(ex.args, converted.args)
+        self.assertEqual(ex.__dict__, converted._kwargs)
+        self.assertNotIn('_kwargs', converted._kwargs)
+        self.assertEqual('paylist-exploded', converted.type)
+        self.assertEqual(400, converted.status_code)
+        r = repr(converted)
+        self.assertTrue(r.startswith('PlaylistError(Bad Request: 400: boom'))
+        self.assertIn("type='paylist-exploded'", r)
+        self.assertIn('status_code=400', r)
+        self.assertNotIn('_kwargs', r)
+
+        # converting our own error keeps its fields
+        again = self.cli._convert_exception(converted)
+        self.assertEqual(converted._kwargs, again._kwargs)
+
+        ex.type = 'something-else'
+        self.assertIs(ex, self.cli._convert_exception(ex))
+
+    def test_default_serialize(self):
+
+        class Timestamp(datetime.datetime):
+            pass
+
+        ts = Timestamp(2013, 1, 2, 3, 4, 5)
+        self.assertEqual(
+            '2013-01-02T03:04:05Z', self.cli._default_serialize(ts))
+        self.assertIn(Timestamp, self.example._SERIALIZERS)
+        _, body = self.cli._serialize({'at': ts, 'amount': 0.1 + 0.2})
+        self.assertEqual(
+            {'at': '2013-01-02T03:04:05Z', 'amount': 0.1 + 0.2},
+            from_json(body))
+        with self.assertRaises(TypeError):
+            self.cli._default_serialize(object())
@@ -3,8 +3,10 @@ Library for helping you write nice clients for RESTful APIs.
 """
 from __future__ import division
 import abc
+import atexit
+import collections
 import logging
-import math
+import os
 import pprint
 import re
 import threading
@@ -13,6 +15,10 @@ import urllib
 import urlparse
 
 import requests
+try:
+    import concurrent.futures as futures
+except ImportError:
+    futures = None
 
 __version__ = '0.23'
 
@@ -26,6 +32,7 @@ __all__ = [
     'URIGen',
     'ResourceRegistry',
     'Resource',
+    'set_io_pool',
 ]
 
 logger = logging.getLogger(__name__)
@@ -65,6 +72,73 @@ def classproperty(func):
     return _ClassPropertyDescriptor(func)
 
 
+def _submit(pool, client, fn, *args):
+    # `Client` is thread local so a worker would otherwise see the class
+    # default config rather than the caller's (e.g. inside `with client:`).
+    config = client.config
+
+    def _call():
+        with client:
+            client.config = config
+            return fn(*args)
+
+    return pool.submit(_call)
+
+
+def _run_bounded(calls, parallelism):
+    # run `(client, fn, args)` calls on the shared executor with at most
+    # `parallelism` in flight at once, returning their results in order
+    pool = _io_pool
+    results = []
+    pending = collections.deque()
+    try:
+        for client, fn, args in calls:
+            if len(pending) >= parallelism:
+                results.append(pending.popleft().result())
+            pending.append(_submit(pool, client, fn, *args))
+        while pending:
+            results.append(pending.popleft().result())
+    finally:
+        for p in pending:
+            p.cancel()
+    return results
+
+
+def _io_pool_size(default=16):
+    value = os.environ.get('WAC_IO_THREADS')
+    if value is None:
+        return default
+    try:
+        size = int(value)
+    except ValueError:
+        size = 0
+    if size <= 0:
+        logger.warning(
+            "Ignoring invalid WAC_IO_THREADS '%s', using %s", value, default)
+        return default
+    return size
+
+
+if futures is not None:
+    #: Executor shared for background page fetches and parallel requests.
+    _io_pool = futures.ThreadPoolExecutor(max_workers=_io_pool_size())
+    atexit.register(_io_pool.shutdown, wait=False)
+else:
+    _io_pool = None
+
+
+def set_io_pool(pool):
+    """
+    Replaces the executor used for background page fetches and parallel
+    requests (see `Pagination` and `Query`) and returns the previous one.
+    Anything with a ``concurrent.futures.Executor`` compatible `submit` will
+    do, e.g. an inline executor for deterministic tests.
+    """
+    global _io_pool
+    previous, _io_pool = _io_pool, pool
+    return previous
+
+
 # client
 
 class Config(object):
@@ -220,18 +294,19 @@ class Config(object):
         pprint.pprint(response.content)
 
     def copy(self):
-        c = Config(self.root_url)
-        c.auth = self.auth
+        # skip __init__/reset, they'd build containers we replace right away
+        c = self.__class__.__new__(self.__class__)
+        c.__dict__.update(self.__dict__)
         c.headers = self.headers.copy()
-        c.allow_redirects = self.allow_redirects
-        c.error_cls = self.error_cls
         c.before_request = self.before_request[:]
         c.after_request = self.after_request[:]
-        c.keep_alive = self.keep_alive
-        c.timeout = self.timeout
         return c
 
 
+# only these can hold nested resources, anything else is loaded as-is
+_CONTAINER_TYPES = (dict, list, tuple)
+
+
 class _ObjectifyMixin(object):
 
     @classmethod
@@ -258,11 +333,16 @@ class _ObjectifyMixin(object):
                     value = _type_cls(resource_cls, **value)
         if isinstance(value, dict):
             value = dict(
-                (k, cls._load(resource_cls, v))
+                (k, cls._load(resource_cls, v)
+                    if isinstance(v, _CONTAINER_TYPES) else v)
                 for k, v in value.iteritems()
             )
         elif isinstance(value, (list, tuple)):
-            value = [cls._load(resource_cls, v) for v in value]
+            value = [
+                cls._load(resource_cls, v)
+                if isinstance(v, _CONTAINER_TYPES) else v
+                for v in value
+            ]
         return value
 
     def _lazy_load(self, resource_cls, property_cls, uri_key, property_key):
@@ -293,25 +373,31 @@ class _ObjectifyMixin(object):
 
     def _objectify(self, resource_cls, **fields):
         cls = type(self)
-        if cls.type and '_type' in fields and fields['_type'] != cls.type:
+        if cls.type and fields.get('_type', cls.type) != cls.type:
             raise ValueError('{0} type "{1}" does not match "{2}"'
                              .format(cls.__name__, cls.type, fields['_type'])
             )
+        uris = fields.get('_uris') or {}
         for key, value in fields.iteritems():
-            if '_uris' in fields and key in fields['_uris']:
-                _uri = fields['_uris'][key]
-                try:
-                    property_cls = resource_cls.registry.match(_uri['_type'])
-                except LookupError:
-                    logger.warning(
-                        "Unable to determine resource for '%s' with type "
-                        "'%s'. Not attaching lazy load property.",
-                        key, _uri['_type'])
-                else:
-                    self._lazy_load(
-                        resource_cls, property_cls, key, _uri['key']
-                    )
-            elif not key.startswith('_'):
+            if key in uris:
+                _uri = uris[key]
+                # the lazy load property is installed on the class so only the
+                # first instance of it needs to resolve the type
+                if not hasattr(cls, _uri['key']):
+                    try:
+                        property_cls = resource_cls.registry.match(
+                            _uri['_type'])
+                    except LookupError:
+                        logger.warning(
+                            "Unable to determine resource for '%s' with type "
+                            "'%s'. Not attaching lazy load property.",
+                            key, _uri['_type'])
+                    else:
+                        self._lazy_load(
+                            resource_cls, property_cls, key, _uri['key']
+                        )
+            elif (not key.startswith('_') and
+                  isinstance(value, _CONTAINER_TYPES)):
                 value = cls._load(resource_cls, value)
             setattr(self, key, value)
 
@@ -434,14 +520,25 @@ class Client(threading.local, object):
     Note that all `Client` instance attributes are thread local but all your
     `Client`s initially will share a `config` so that they can be commonly
     configured.
+
+    By default each thread gets its own `requests.Session`. To pool
+    connections across `Client`s and threads pass one in explicitly::
+
+        session = requests.Session()
+        client = Client(session=session)
     """
 
     __metaclass__ = abc.ABCMeta
     config = None
 
-    def __init__(self, keep_alive=True):
+    def __init__(self, keep_alive=True, session=None):
         super(Client, self).__init__()
-        self.interface = requests.session() if keep_alive else requests
+        if session is not None:
+            self.interface = session
+        elif keep_alive:
+            self.interface = requests.session()
+        else:
+            self.interface = requests
         self._configs = []
 
     def get(self, uri, **kwargs):
@@ -463,6 +560,7 @@ class Client(threading.local, object):
         return self._op(self.interface.delete, uri, **kwargs)
 
     def _op(self, f, uri, **kwargs):
+        config = self.config
 
         def handle_redirect(response):
             if not kwargs.get('return_response', True):
@@ -481,25 +579,25 @@ class Client(threading.local, object):
             if (kwargs.get('return_response', True) and
                         'Content-Type' in ex.response.headers):
                 ex.response.data = self._deserialize(ex.response)
-            for handler in self.config.after_request:
+            for handler in config.after_request:
                 handler(ex.response)
             if ex.response.status_code in requests.sessions.REDIRECT_STATI:
                 raise Redirection(ex)
-            ex = self.config.error_cls(ex)
+            ex = config.error_cls(ex)
             raise ex
 
         kwargs.setdefault('headers', {})
-        kwargs['headers'].update(self.config.headers)
-        kwargs.setdefault('allow_redirects', self.config.allow_redirects)
-        if self.config.auth:
-            kwargs['auth'] = self.config.auth
-        if self.config.timeout is not None:
-            kwargs['timeout'] = self.config.timeout
+        kwargs['headers'].update(config.headers)
+        kwargs.setdefault('allow_redirects', config.allow_redirects)
+        if config.auth:
+            kwargs['auth'] = config.auth
+        if config.timeout is not None:
+            kwargs['timeout'] = config.timeout
 
-        url = self.config.root_url + uri
+        url = config.root_url + uri
 
         method = f.__name__.upper()
-        for handler in self.config.before_request:
+        for handler in config.before_request:
             handler(method, url, kwargs)
 
         try:
@@ -516,7 +614,7 @@ class Client(threading.local, object):
                 'Content-Type' in response.headers):
             response.data = self._deserialize(response)
 
-        for handler in self.config.after_request:
+        for handler in config.after_request:
             handler(response)
 
         return response
@@ -610,14 +708,61 @@ class Pagination(object):
     `current`
         Page data as a dict for the current page if available.
 
-    The standard sequence indexing and slicing protocols are supported.
+    `prefetch`
+        Number of pages to fetch in the background ahead of the one being
+        consumed, where True means 1. Iterating fetches the next page while
+        the current one is consumed and indexing a page also fetches the
+        `prefetch` pages after it concurrently. Fetches run on an executor
+        shared by all `Pagination`s, sized by the ``WAC_IO_THREADS``
+        environment variable (16 by default) or replaced with
+        `set_io_pool`. Requires ``concurrent.futures`` (the ``futures``
+        backport on Python 2), otherwise pages are fetched serially.
+        Defaults to False.
+
+    `cache_size`
+        Number of recently fetched pages kept for repeat index access, least
+        recently used first out. None keeps every page and 0 disables the
+        cache. Defaults to 4.
+
+    The standard sequence indexing and slicing protocols are supported. When
+    prefetching call `close` (or use the `Pagination` as a context manager)
+    to cancel any background fetches that are no longer needed.
     """
 
-    def __init__(self, resource_cls, uri, default_size=10, current=None):
+    __slots__ = (
+        'resource_cls', 'uri', 'size', '_current', 'prefetch', 'cache_size',
+        '_page_cache', '_pending', '_iter_pending',
+    )
+
+    def __init__(self, resource_cls, uri, default_size=10, current=None,
+                 prefetch=False, cache_size=4):
         self.resource_cls = resource_cls
         self.uri, limit, _ = self._parse_uri(uri)
         self.size = limit or default_size
         self._current = current
+        self.prefetch = int(prefetch)
+        self.cache_size = cache_size
+        self._page_cache = collections.OrderedDict()
+        self._pending = {}
+        self._iter_pending = set()
+
+    def _reset(self):
+        for pending in self._pending.itervalues():
+            pending.cancel()
+        self._pending.clear()
+        self._page_cache.clear()
+
+    def close(self):
+        self._reset()
+        for pending in self._iter_pending:
+            pending.cancel()
+        self._iter_pending.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, type_, value, traceback):
+        self.close()
 
     @staticmethod
     def _parse_uri(uri):
@@ -660,23 +805,60 @@ class Pagination(object):
 
         return uri, limit, offset
 
-    def _page(self, key, size=None):
-        size = size or self.size
+    def _fetch(self, offset, limit):
         qs = [
-            ('limit', self.size),
-            ('offset', key * self.size),
+            ('limit', limit),
+            ('offset', offset),
         ]
         qs = urllib.urlencode(qs, doseq=True)
         uri = self.uri + qs
         resp = self.resource_cls.client.get(uri)
         return self.resource_cls.page_cls(self.resource_cls, **resp.data)
 
+    def _page(self, key, size=None):
+        size = size or self.size
+        cache_key = (key, size)
+        page = self._page_cache.pop(cache_key, None)
+        if page is None:
+            pending = self._pending.pop(cache_key, None)
+            if pending is not None:
+                page = pending.result()
+            else:
+                page = self._fetch(key * self.size, size)
+        # only whole pages are kept, `count` and `one` probes always refetch
+        if self.cache_size != 0 and size == self.size:
+            if (self.cache_size and
+                    len(self._page_cache) >= self.cache_size):
+                self._page_cache.popitem(last=False)
+            self._page_cache[cache_key] = page
+        if self.prefetch and _io_pool is not None and size == self.size:
+            self._prefetch_after(key, page)
+        return page
+
+    def _prefetch_after(self, key, page):
+        stop = key + 1 + self.prefetch
+        if page.total is not None:
+            # never prefetch past the last page
+            stop = min(stop, -(-page.total // self.size))
+        wanted = [(k, self.size) for k in xrange(key + 1, stop)]
+        # drop pages left over from a window we have moved away from
+        for cache_key in self._pending.keys():
+            if cache_key not in wanted:
+                self._pending.pop(cache_key).cancel()
+        client = self.resource_cls.client
+        for cache_key in wanted:
+            if cache_key in self._page_cache or cache_key in self._pending:
+                continue
+            self._pending[cache_key] = _submit(
+                _io_pool, client, self._fetch, cache_key[0] * self.size,
+                self.size)
+
     def count(self):
         if self._current:
             total = self._current.total
         else:
             total = self._page(0, 1).total
-        return int(math.ceil(total / self.size))
+        return -(-total // self.size)
 
     @property
     def fetched(self):
@@ -691,10 +873,11 @@ class Pagination(object):
     def one(self):
         if self.count() > 1:
             raise MultipleResultsFound()
-        self._current = self._page(0)
-        return self._current
+        return self.first()
 
     def first(self):
+        # starting over so anything cached may be stale
+        self._reset()
         self._current = self._page(0)
         return self._current
 
@@ -710,17 +893,52 @@ class Pagination(object):
         self._current = self._current.next
         return self._current
 
+    def _next_key(self, page):
+        if page.offset is None or page.offset % self.size:
+            return None
+        return page.offset // self.size + 1
+
+    def _next_page(self, page):
+        page = page.next
+        if isinstance(page, basestring):
+            uri = page
+            resp = self.resource_cls.client.get(uri)
+            page = self.resource_cls.page_cls(self.resource_cls, **resp.data)
+        return page
+
     def __iter__(self):
+        prefetch = self.prefetch and _io_pool is not None
         page = self.current
-        while True:
-            yield page
-            page = page.next
-            if not page:
-                break
-            if isinstance(page, basestring):
-                uri = page
-                resp = self.resource_cls.client.get(uri)
-                page = self.resource_cls.page_cls(self.resource_cls, **resp.data)
+        # local to this iterator as several may be walking the same pages
+        pending = None
+        try:
+            while True:
+                key = self._next_key(page) if prefetch else None
+                if key is not None:
+                    # on a page boundary so walk by index, sharing the window
+                    # `_page` prefetches rather than fetching it again
+                    self._prefetch_after(key - 1, page)
+                elif prefetch:
+                    pending = _submit(
+                        _io_pool, self.resource_cls.client,
+                        self._next_page, page)
+                    self._iter_pending.add(pending)
+                yield page
+                if key is not None:
+                    page = self._page(key) if page.next else None
+                elif prefetch:
+                    page = pending.result()
+                    self._iter_pending.discard(pending)
+                    pending = None
+                else:
+                    page = self._next_page(page)
+                if not page:
+                    break
+        finally:
+            # abandoned part way through so drop the fetch if not yet started
+            if pending is not None:
+                pending.cancel()
+                self._iter_pending.discard(pending)
         self._current = page
 
     def __len__(self):
@@ -769,24 +987,72 @@ class PaginationMixin(object):
     The standard sequence indexing and slicing protocols are supported.
     """
 
-    def count(self):
-        if self.pagination.fetched:
-            total = self.pagination.current.total
-        else:
-            total = self.pagination._page(0, 1).total
-        return total
-
-    def all(self):
-        return list(self)
+    #: Number of pages fetched concurrently by `all` and slicing, or None to
+    #: fetch them one after another.
+    parallelism = None
 
-    def one(self):
+    def count(self):
+        # fetch a full first page rather than a 1 item probe so that
+        # iterating afterwards can start from it
+        if not self.pagination.fetched:
+            self.pagination.first()
+        return self.pagination.current.total
+
+    def _fetch_concurrently(self, ranges, parallelism):
+        pagination = self.pagination
+        client = pagination.resource_cls.client
+        return _run_bounded(
+            ((client, pagination._fetch, r) for r in ranges), parallelism)
+
+    def _fetch_range(self, lo, hi, fetched, step, parallelism):
+        # fetch the items from `lo + len(fetched)` up to `hi` as limit/offset
+        # requests of `step` items, continuing serially if the server caps
+        # the limit, and stopping short if it runs out of items
+        fetched = list(fetched)
+        if parallelism and _io_pool is not None and lo + len(fetched) < hi:
+            ranges = [
+                (offset, min(step, hi - offset))
+                for offset in xrange(lo + len(fetched), hi, step)
+            ]
+            pages = self._fetch_concurrently(ranges, parallelism)
+            for (_, limit), page in zip(ranges, pages):
+                fetched.extend(page.items)
+                if len(page.items) < limit:
+                    # short page so finish off the range serially below
+                    break
+        while lo + len(fetched) < hi:
+            offset = lo + len(fetched)
+            page = self.pagination._fetch(offset, hi - offset)
+            if not page.items:
+                break
+            fetched.extend(page.items)
+        return fetched
+
+    def all(self, parallelism=None):
+        parallelism = parallelism or self.parallelism
+        if not parallelism or _io_pool is None:
+            return list(self)
+        # the first page gives the total so the rest can be fetched at once
+        pagination = self.pagination
+        if not (pagination.fetched and pagination.current.offset == 0):
+            pagination.first()
+        first = pagination.current
+        if first.total is None:
+            return list(self)
+        # the server may cap the page size so step by what it returned
+        return self._fetch_range(
+            0, first.total, first.items,
+            len(first.items) or pagination.size, parallelism)
+
+    def one(self, strict=True):
+        # a second item is only needed to detect multiple results
         if self.pagination.fetched and self.pagination.current.offset == 0:
             items = self.pagination.current.items
             total = self.pagination.current.total
         else:
-            items = self.pagination._page(0, 2).items
+            items = self.pagination._page(0, 2 if strict else 1).items
             total = len(items)
-        if total > 1:
+        if strict and total > 1:
             raise MultipleResultsFound()
         elif total == 0:
             raise NoResultFound()
@@ -800,7 +1066,9 @@ class PaginationMixin(object):
         return items[0] if items else None
 
     def __iter__(self):
-        self.pagination.first()
+        if not (self.pagination.fetched and
+                self.pagination.current.offset == 0):
+            self.pagination.first()
         for page in self.pagination:
             for v in page.items:
                 yield v
@@ -816,25 +1084,54 @@ class PaginationMixin(object):
         if key.step == 0:
             raise TypeError('slice step cannot be zero')
         start, stop, step = key.indices(self.count())
+        indices = xrange(start, stop, step)
+        if not indices:
+            return []
+        if abs(step) <= self.pagination.size:
+            return self._ranged_slice(indices)
+        if self.parallelism and _io_pool is not None:
+            # every index is on a different page so fetch just those items
+            pages = self._fetch_concurrently(
+                [(i, 1) for i in indices], self.parallelism)
+            if not all(page.items for page in pages):
+                raise IndexError('index out of range')
+            return [page.items[0] for page in pages]
         page = None
         items = []
-        for i in xrange(start, stop, step):
-            idx = int(i / self.pagination.size)
-            offset = i % self.pagination.size
+        for i in indices:
+            idx, offset = divmod(i, self.pagination.size)
             if not page or page.index != idx:
                 page = self.pagination[idx]
             item = page.items[offset]
             items.append(item)
         return items
 
+    def _ranged_slice(self, indices):
+        # fetch the covered range as limit/offset requests rather than page by
+        # page, continuing if the server caps the limit
+        lo = min(indices[0], indices[-1])
+        hi = max(indices[0], indices[-1]) + 1
+        fetched = []
+        if self.pagination.fetched:
+            # `count` has usually just fetched the current page so start with
+            # whatever part of the range it already holds
+            current = self.pagination.current
+            if current.offset <= lo < current.offset + len(current.items):
+                fetched = current.items[
+                    lo - current.offset:hi - current.offset]
+        fetched = self._fetch_range(
+            lo, hi, fetched, self.pagination.size, self.parallelism)
+        if lo + len(fetched) < hi:
+            raise IndexError('index out of range')
+        return [fetched[i - lo] for i in indices]
+
     def _index(self, key):
         if key < 0:
             key += self.count()
             if key < 0:
                 raise IndexError('index out of range')
-        idx = int(key / self.pagination.size)
+        idx, offset = divmod(key, self.pagination.size)
         page = self.pagination[idx]
-        offset = key % self.pagination.size
         if len(self.pagination.current.items) < offset:
             raise IndexError('index out of range')
         return page.items[offset]
@@ -874,6 +1171,8 @@ class FilterExpression(object):
         ~MyResource.f.description.contains('hiya')
     """
 
+    __slots__ = ('field', 'op', 'value', 'inv_op')
+
     def __init__(self, field, op, value, inv_op):
         self.field = field
         self.op = op
@@ -907,6 +1206,8 @@ class SortExpression(object):
         MyResource.fields.b.desc()
     """
 
+    __slots__ = ('field', 'ascending')
+
     def __init__(self, field, ascending):
         self.field = field
         self.ascending = ascending
@@ -930,6 +1231,15 @@ class Query(PaginationMixin):
     `page_size`
         The number of items in each page.
 
+    `prefetch`
+        Passed along to `Pagination`. Defaults to False.
+
+    `parallelism`
+        Number of pages `all` and slicing fetch concurrently once the total
+        is known, run on the executor shared with `Pagination` prefetching.
+        Requires ``concurrent.futures``. Defaults to None which fetches them
+        serially.
+
     Note that the pages that are part of the `Query` can be accessed via the
     `pagination`prooperty. However you can also access `Query` as a sequence
     of `resource`s which is provied by `PaginationMixin`.
@@ -939,11 +1249,14 @@ class Query(PaginationMixin):
     The following sorting format is assumed:
     """
 
-    def __init__(self, resource_cls, uri, page_size):
+    def __init__(self, resource_cls, uri, page_size, prefetch=False,
+                 parallelism=None):
         super(Query, self).__init__()
         self.resource_cls = resource_cls
         parsed = self._parse_uri(uri, page_size)
         self.uri, self.filters, self.sorts, self.page_size = parsed
+        self.prefetch = prefetch
+        self.parallelism = parallelism
         self._pagination = None
 
     @staticmethod
@@ -967,10 +1280,7 @@ class Query(PaginationMixin):
         return uri, filters, sorts, page_size
 
     def _qs(self):
-        qs = []
-        qs += self.filters
-        qs += self.sorts
-        return urllib.urlencode(qs, doseq=True)
+        return urllib.urlencode(self.filters + self.sorts, doseq=True)
 
     def filter(self, *args, **kwargs):
         for expression in args:
@@ -978,19 +1288,18 @@ class Query(PaginationMixin):
                 raise ValueError('"{0}" is not a FilterExpression'.format(
                     expression))
             if expression.op == '=':
-                f = '{0}'.format(expression.field.name)
+                f = expression.field.name
             else:
-                f = '{0}[{1}]'.format(expression.field.name, expression.op)
+                f = expression.field.name + '[' + expression.op + ']'
             values = expression.value
             if not isinstance(values, (list, tuple)):
                 values = [values]
             f = (f, ','.join(str(v) for v in values))
             self.filters.append(f)
         for k, values in kwargs.iteritems():
-            f = '{0}'.format(k)
             if not isinstance(values, (list, tuple)):
                 values = [values]
-            f = (f, ','.join(str(v) for v in values))
+            f = (k, ','.join(str(v) for v in values))
             self.filters.append(f)
         self._pagination = None  # invalidate pagination
         return self
@@ -1016,7 +1325,9 @@ class Query(PaginationMixin):
     def pagination(self):
         if self._pagination is None:
             uri = self.uri + '?' + self._qs()
-            self._pagination = Pagination(self.resource_cls, uri, self.page_size)
+            self._pagination = Pagination(
+                self.resource_cls, uri, self.page_size,
+                prefetch=self.prefetch)
         return self._pagination
 
 
@@ -1035,6 +1346,8 @@ class URIGen(object):
         Defaults to None.
     """
 
+    _FIELD_RE = re.compile(r'\{(\w[\w_-]*)\}')
+
     def __init__(self, collection, member, parent=None):
         self.collection = collection
         self.collection_fmt = self._parse(collection)
@@ -1042,15 +1355,22 @@ class URIGen(object):
             self.collection_fmt = parent.member_fmt + self.collection_fmt
         self.member = member
         self.member_fmt = self.collection_fmt + self._parse(member)
+        # %-templates of the above, cheaper to substitute than str.format
+        self._collection_tmpl = self._template(self.collection_fmt)
+        self._member_tmpl = self._template(self.member_fmt)
+
+    @classmethod
+    def _template(cls, fmt):
+        return cls._FIELD_RE.sub(r'%(\1)s', fmt.replace('%', '%%'))
 
     @classmethod
     def _parse(cls, fragment):
         fragment = fragment.strip('/')
         parts = []
         for part in fragment.split('/'):
-            m = re.match(r'\{(?P<name>\w[\w_-]*)\}', part)
+            m = cls._FIELD_RE.match(part)
             if m:
-                part = m.group('name')
+                part = m.group(1)
                 parts.append('{' + part + '}')
             else:
                 parts.append(part)
@@ -1065,10 +1385,10 @@ class URIGen(object):
             return None
 
     def collection_uri(self, **ids):
-        return (self.collection_fmt).format(**ids)
+        return self._collection_tmpl % ids
 
     def member_uri(self, **ids):
-        return (self.member_fmt).format(**ids)
+        return self._member_tmpl % ids
 
 
 # resources
@@ -1146,7 +1466,9 @@ class _ResourceField(object):
         self.name = name
 
     def __getattr__(self, name):
-        return _ResourceField('{0}.{1}'.format(self.name, name))
+        field = _ResourceField(self.name + '.' + name)
+        setattr(self, name, field)
+        return field
 
     def asc(self):
         return SortExpression(self, ascending=True)
@@ -1406,3 +1728,21 @@ class Resource(_ObjectifyMixin):
 
     def delete(self):
         self.client.delete(self.uri)
+
+    @classmethod
+    def save_many(cls, resources, parallelism=8):
+        return cls._many('save', resources, parallelism)
+
+    @classmethod
+    def delete_many(cls, resources, parallelism=8):
+        cls._many('delete', resources, parallelism)
+
+    @staticmethod
+    def _many(method, resources, parallelism):
+        # one request per resource as with `save`/`delete` but concurrently
+        resources = list(resources)
+        if not parallelism or _io_pool is None:
+            return [getattr(r, method)() for r in resources]
+        return _run_bounded(
+            ((r.client, getattr(r, method), ()) for r in resources),
+            parallelism)